@@ -0,0 +1,101 @@
+"""Recall-vs-memory benchmark for the int8 QuantizedVectorStore.
+
+Compares the store against exact brute-force search over the same vectors
+and reports recall@k together with the bytes held in memory.
+
+    python benchmarks/quantization_benchmark.py --vectors 20000 --queries 200
+    python benchmarks/quantization_benchmark.py --embeddings my_embeddings.npy
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.vector_store import QuantizedVectorStore  # numpy only; core imports its other modules lazily
+
+
+def synthetic_embeddings(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered, unit-normalised vectors shaped roughly like text embeddings"""
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, size=n)] + 0.5 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_chunks(n: int, chunk_chars: int, rng: np.random.Generator):
+    """Chunk text, metadata and IDs shaped like what process_document stores"""
+    words = ["manual", "system", "figure", "value", "section", "device", "page", "result", "table", "process"]
+    documents, metadatas, ids = [], [], []
+    for i in range(n):
+        text = " ".join(rng.choice(words, size=chunk_chars // 6))[:chunk_chars]
+        documents.append(text)
+        metadatas.append({
+            "page": i // 4 + 1,
+            "position": i % 4,
+            "fingerprint": hashlib.sha256(str(i // 4).encode('utf-8')).hexdigest()
+        })
+        ids.append(hashlib.md5(str(i).encode('utf-8')).hexdigest())
+    return documents, metadatas, ids
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    distances = np.einsum('ij,ij->i', vectors - query, vectors - query)
+    return np.argsort(distances)[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--embeddings', help="Optional .npy file of real embeddings to benchmark against")
+    parser.add_argument('--vectors', type=int, default=20000)
+    parser.add_argument('--dim', type=int, default=768)  # models/embedding-001 output size
+    parser.add_argument('--clusters', type=int, default=64)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--chunk-chars', type=int, default=1000)  # ProcessingConfig.chunk_size
+    parser.add_argument('--rerank', type=int, nargs='+', default=[0, 10, 50, 200])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.embeddings:
+        vectors = np.load(args.embeddings).astype(np.float32)
+    else:
+        vectors = synthetic_embeddings(args.vectors + args.queries, args.dim, args.clusters, rng)
+    queries, vectors = vectors[:args.queries], vectors[args.queries:]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = QuantizedVectorStore(os.path.join(tmp, "vectors.f32"))
+        documents, metadatas, ids = synthetic_chunks(len(vectors), args.chunk_chars, rng)
+        store.add(documents=documents, embeddings=vectors, metadatas=metadatas, ids=ids)
+        truth = [set(exact_top_k(vectors, q, args.k)) for q in queries]
+
+        usage = store.memory_usage()
+        full_bytes = vectors.nbytes
+        print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}, "
+              f"{args.chunk_chars}-char chunks")
+        print(f"float32 vectors in memory : {full_bytes / 2**20:8.2f} MiB (ChromaDB keeps documents on disk)")
+        print(f"int8 codes in memory      : {usage['vectors'] / 2**20:8.2f} MiB "
+              f"({usage['vectors'] / full_bytes:.1%} of float32)")
+        print(f"documents/metadata on heap: {usage['documents'] / 2**20:8.2f} MiB")
+        print(f"int8 store in memory total: {usage['in_memory'] / 2**20:8.2f} MiB "
+              f"({usage['in_memory'] / full_bytes:.1%} of float32)")
+        print(f"memory-mapped full vectors: {usage['memory_mapped'] / 2**20:8.2f} MiB on disk")
+        print()
+        print(f"{'rerank':>8} {'recall@' + str(args.k):>10} {'ms/query':>10}")
+
+        for rerank in args.rerank:
+            hits = 0
+            start = time.perf_counter()
+            for query, expected in zip(queries, truth):
+                # rerank=0 ranks on the int8 codes alone, i.e. candidates == k
+                indices, _ = store.search(query, args.k, rerank_candidates=rerank)
+                hits += len(expected.intersection(indices.tolist()))
+            elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+            print(f"{rerank:>8} {hits / (len(queries) * args.k):>10.4f} {elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
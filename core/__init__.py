@@ -1,14 +1,24 @@
-from .document_processor import DocumentProcessor
-from .image_processor import ImageProcessor
-from .model_manager import ModelManager
-from .retriever import Retriever
-from .utils import setup_logging, ProcessingConfig
+import importlib
 
-__all__ = [
-    'DocumentProcessor',
-    'ImageProcessor',
-    'ModelManager',
-    'Retriever',
-    'ProcessingConfig',
-    'setup_logging'
-]
\ No newline at end of file
+# Exports are imported on first access, so numpy-only modules such as the
+# vector store can be used without chromadb, langchain or google-genai
+_EXPORTS = {
+    'DocumentProcessor': '.document_processor',
+    'ImageProcessor': '.image_processor',
+    'ModelManager': '.model_manager',
+    'Retriever': '.retriever',
+    'QuantizedVectorStore': '.vector_store',
+    'QueryRouter': '.query_router',
+    'EmbeddingQueryRouter': '.query_router',
+    'KeywordQueryRouter': '.query_router',
+    'RouteDecision': '.query_router',
+    'ProcessingConfig': '.utils',
+    'setup_logging': '.utils'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,12 +1,44 @@
 import fitz
-from typing import Dict, Any
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from typing import Dict, Any, List, Optional
 import logging
 from .exceptions import DocumentProcessingError
 from .utils import ProcessingConfig
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
 logger = logging.getLogger(__name__)
 
+def _ocr_pages(pdf_path: str, page_numbers: List[int], dpi: int, language: str) -> Dict[int, Optional[str]]:
+    """Render and OCR pages one at a time so a worker only holds a single page image.
+
+    Pages that fail are returned as None so one bad page does not sink the document.
+    """
+    results = {}
+    doc = fitz.open(pdf_path)
+    try:
+        for page_number in page_numbers:
+            try:
+                pixmap = doc[page_number - 1].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+                image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+                results[page_number] = pytesseract.image_to_string(image, lang=language)
+                del image, pixmap
+            except Exception as e:
+                logger.error(f"Error running OCR on page {page_number}: {e}")
+                results[page_number] = None
+    finally:
+        doc.close()
+    return results
+
 class DocumentProcessor:
     def __init__(self, config: ProcessingConfig):
         self.config = config
@@ -15,14 +47,20 @@ class DocumentProcessor:
             chunk_overlap=self.config.chunk_overlap,
             separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
         )
+        self._ocr_available = None
 
     def extract_pdf_content(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract text and tables from PDF"""
+        """Extract text, tables and per-page fingerprints from PDF"""
         content = {
             'text': [],
-            'tables': []
+            'tables': [],
+            'fingerprints': {},
+            'ocr_pages': set()  # Scanned pages whose text came from OCR
         }
         
+        scanned_pages = {}
+        scanned_parts = {}
+        
         try:
             doc = fitz.open(pdf_path)
             
@@ -34,15 +72,47 @@ class DocumentProcessor:
                         'content': text,
                         'page': page_num + 1
                     })
+                elif self.config.ocr_scanned_pages and page.get_images():
+                    # Image-only page, most likely a scan: its text has to come from OCR
+                    scanned_pages[page_num + 1] = self._scan_hash(doc, page)
                 
                 # Extract tables
+                page_tables = []
                 tables = page.find_tables()
                 if tables:
                     for table in tables:
+                        page_tables.append(table.extract())
                         content['tables'].append({
-                            'content': table.extract(),
+                            'content': page_tables[-1],
                             'page': page_num + 1
                         })
+                
+                # Fingerprint the page so unchanged pages can be reused on re-upload
+                image_digests = self._image_digests(doc, page)
+                if page_num + 1 in scanned_pages:
+                    # Scanned pages are fingerprinted after OCR, whose outcome is part of it
+                    scanned_parts[page_num + 1] = (image_digests, page_tables)
+                else:
+                    content['fingerprints'][page_num + 1] = self.fingerprint_page(text, image_digests, page_tables)
+            
+            if scanned_pages:
+                ocr_results = self.ocr_scanned_pages(pdf_path, scanned_pages)
+                for page_number, (image_digests, page_tables) in scanned_parts.items():
+                    # A page without an OCR result gets a different fingerprint, so the
+                    # upload after a successful retry treats it as changed and indexes it
+                    ocr_state = "ocr" if page_number in ocr_results else "no-ocr"
+                    content['fingerprints'][page_number] = self.fingerprint_page(
+                        f"{scanned_pages[page_number]}:{ocr_state}", image_digests, page_tables
+                    )
+                for page_number, ocr_text in ocr_results.items():
+                    if ocr_text.strip():
+                        content['text'].append({
+                            'content': ocr_text,
+                            'page': page_number,
+                            'ocr': True
+                        })
+                        content['ocr_pages'].add(page_number)
+                content['text'].sort(key=lambda item: item['page'])
             
             return content
         except Exception as e:
@@ -51,6 +121,93 @@ class DocumentProcessor:
             if 'doc' in locals():
                 doc.close()
 
+    def _image_digests(self, doc: fitz.Document, page: fitz.Page) -> List[str]:
+        """Digest the raw stream of every image on a page, so content changes are seen even when xrefs are not"""
+        return [
+            hashlib.sha256(doc.xref_stream_raw(img[0]) or b"").hexdigest()
+            for img in page.get_images(full=True)
+        ]
+
+    def _scan_hash(self, doc: fitz.Document, page: fitz.Page) -> str:
+        """Hash a page's content stream and raw image data without rendering it"""
+        hasher = hashlib.sha256()
+        hasher.update(page.read_contents())
+        for digest in self._image_digests(doc, page):
+            hasher.update(digest.encode('utf-8'))
+        # OCR output also depends on how the page is rendered and read
+        hasher.update(f"{self.config.ocr_dpi}:{self.config.ocr_language}".encode('utf-8'))
+        return hasher.hexdigest()
+
+    def _check_ocr_available(self) -> bool:
+        """Check once whether pytesseract and the tesseract binary it drives are usable"""
+        if self._ocr_available is None:
+            if pytesseract is None:
+                logger.warning("pytesseract is not installed, scanned pages will not be OCR'd")
+                self._ocr_available = False
+            else:
+                try:
+                    pytesseract.get_tesseract_version()
+                    self._ocr_available = True
+                except Exception as e:
+                    logger.warning(f"tesseract is not available, scanned pages will not be OCR'd: {e}")
+                    self._ocr_available = False
+        return self._ocr_available
+
+    def ocr_scanned_pages(self, pdf_path: str, scanned_pages: Dict[int, str]) -> Dict[int, str]:
+        """OCR image-only pages in parallel, reusing cached text for pages seen before"""
+        if not self._check_ocr_available():
+            logger.warning(f"Skipping OCR of {len(scanned_pages)} scanned pages")
+            return {}
+        
+        results = {}
+        missing = []
+        for page_number, scan_hash in scanned_pages.items():
+            cache_path = os.path.join(self.config.ocr_cache_dir, f"{scan_hash}.txt")
+            if os.path.exists(cache_path):
+                with open(cache_path, encoding='utf-8') as f:
+                    results[page_number] = f.read()
+            else:
+                missing.append(page_number)
+        
+        if missing:
+            logger.info(f"Running OCR on {len(missing)} scanned pages ({len(results)} cached)")
+            workers = min(self.config.ocr_workers or os.cpu_count() or 1, len(missing))
+            try:
+                # Each worker opens the PDF itself and renders its pages one at a time.
+                # Workers are spawned rather than forked, since forking the threaded
+                # Gradio server can deadlock on locks held by other threads.
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    batches = [
+                        executor.submit(_ocr_pages, pdf_path, missing[i::workers],
+                                        self.config.ocr_dpi, self.config.ocr_language)
+                        for i in range(workers)
+                    ]
+                    os.makedirs(self.config.ocr_cache_dir, exist_ok=True)
+                    for batch in batches:
+                        for page_number, text in batch.result().items():
+                            if text is None:
+                                continue  # Failed pages are not cached so they are retried next time
+                            results[page_number] = text
+                            cache_path = os.path.join(self.config.ocr_cache_dir, f"{scanned_pages[page_number]}.txt")
+                            # Write then rename, so a crash never leaves truncated text under the hash
+                            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                            with open(tmp_path, 'w', encoding='utf-8') as f:
+                                f.write(text)
+                            os.replace(tmp_path, cache_path)
+            except Exception as e:
+                # A crashed worker only costs the OCR text; the rest of the document is still indexed
+                logger.error(f"Error running OCR on scanned pages, continuing without them: {e}")
+        
+        return results
+
+    def fingerprint_page(self, text: str, image_digests: List[str], tables: List[Any]) -> str:
+        """Hash the extracted text, image content digests and table output of a page"""
+        hasher = hashlib.sha256()
+        hasher.update(text.encode('utf-8'))
+        hasher.update(json.dumps(image_digests).encode('utf-8'))
+        hasher.update(json.dumps(tables, default=str).encode('utf-8'))
+        return hasher.hexdigest()
+
     def create_chunks(self, text_content: str) -> list[str]:
         """Split text into chunks for processing"""
         try:
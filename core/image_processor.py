@@ -80,7 +80,7 @@ import os
 from PIL import Image, ImageEnhance, ImageFilter
 import fitz
 import numpy as np
-from typing import List, Dict, Any, Tuple, Optional, Union
+from typing import List, Dict, Any, Tuple, Optional, Union, Set
 import logging
 from .exceptions import ImageProcessingError
 from .utils import ProcessingConfig
@@ -138,13 +138,16 @@ class ImageProcessor:
         image.save(img_byte_array, format=format, quality=self.quality)
         return img_byte_array.getvalue()
 
-    def extract_images(self, pdf_path: str, enhance: bool = False) -> List[Dict[str, Any]]:
-        """Extract and process images from PDF"""
+    def extract_images(self, pdf_path: str, enhance: bool = False, pages: Optional[Set[int]] = None) -> List[Dict[str, Any]]:
+        """Extract and process images from PDF, optionally limited to the given 1-based pages"""
         images = []
         try:
             doc = fitz.open(pdf_path)
             
             for page_num, page in enumerate(doc):
+                if pages is not None and page_num + 1 not in pages:
+                    continue
+                
                 # Extract text blocks for OCR reference
                 text_blocks = page.get_text("blocks")
                 
@@ -217,8 +220,9 @@ class ImageProcessor:
         except Exception as e:
             raise ImageProcessingError(f"Error processing input image: {e}")
 
-    def prepare_vision_prompt(self, query: str, text_context: str, images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def prepare_vision_prompt(self, query: str, text_context: str, images: List[Dict[str, Any]], max_images: Optional[int] = None) -> List[Dict[str, Any]]:
         """Prepare multimodal prompt with text and images"""
+        images = images[:max_images or self.config.max_images]
         prompt_parts = [{
             "text": f"""Based on the provided context and images, answer the following question.
                 If you refer to specific content or images, include page numbers and image locations.
@@ -228,7 +232,7 @@ class ImageProcessor:
                 {text_context}
 
                 Related Image Text:
-                {' '.join(img.get('ocr_text', '') for img in images[:self.config.max_images])}
+                {' '.join(img.get('ocr_text', '') for img in images)}
 
                 Question: {query}
 
@@ -237,7 +241,7 @@ class ImageProcessor:
         }]
         
         # Add images in the correct format
-        for img_data in images[:self.config.max_images]:
+        for img_data in images:
             try:
                 image_bytes = base64.b64decode(img_data['image'])
                 prompt_parts.append({
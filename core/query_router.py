@@ -0,0 +1,170 @@
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Tuple
+import logging
+from .utils import ProcessingConfig
+
+logger = logging.getLogger(__name__)
+
+# Retrieval paths a query can be routed to
+ROUTE_NONE = "none"              # Conversational follow-up, no retrieval
+ROUTE_TEXT = "text"              # Text chunks only
+ROUTE_MULTIMODAL = "multimodal"  # Text chunks plus page images for the vision model
+ROUTE_TABLE = "table"            # Text chunks plus extracted tables
+
+@dataclass
+class RouteDecision:
+    """Outcome of routing a query, kept for logging and tuning"""
+    route: str
+    retrieval_k: int
+    max_images: int
+    include_tables: bool
+    scores: Dict[str, float] = field(default_factory=dict)
+    latency_ms: float = 0.0
+
+class QueryRouter(ABC):
+    """Base class for query routers.
+
+    Subclasses implement classify() and return the chosen route together with
+    the per-route scores; route() turns that into a RouteDecision and times it.
+    """
+
+    def __init__(self, config: ProcessingConfig):
+        self.config = config
+
+    @abstractmethod
+    def classify(self, query: str, query_embedding: List[float]) -> Tuple[str, Dict[str, float]]:
+        """Return the chosen route and the score of every route considered"""
+
+    def budget(self, route: str, query: str, scores: Dict[str, float]) -> Tuple[int, int]:
+        """Number of chunks and images to fetch for a route; override to tune per query"""
+        if route == ROUTE_NONE:
+            return 0, 0
+        if route == ROUTE_TABLE:
+            # Tables are picked from the retrieved pages, so cover more of them
+            return self.config.retrieval_k * 2, 0
+        if route == ROUTE_MULTIMODAL:
+            # Images come from the retrieved pages, so a single-figure query
+            # usually gets far fewer than this cap
+            return self.config.retrieval_k, self.config.max_images
+        return self.config.retrieval_k, 0
+
+    def route(self, query: str, query_embedding: List[float]) -> RouteDecision:
+        """Decide which retrieval path and how many chunks/images a query needs"""
+        start = time.perf_counter()
+        route, scores = self.classify(query, query_embedding)
+        retrieval_k, max_images = self.budget(route, query, scores)
+        decision = RouteDecision(
+            route=route,
+            retrieval_k=retrieval_k,
+            max_images=max_images,
+            include_tables=route == ROUTE_TABLE,
+            scores=scores
+        )
+        decision.latency_ms = (time.perf_counter() - start) * 1000
+        return decision
+
+class KeywordQueryRouter(QueryRouter):
+    """Word-list router matching the original image keyword check"""
+
+    IMAGE_WORDS = ['image', 'figure', 'picture', 'diagram', 'graph', 'show', 'visual']
+    TABLE_WORDS = ['table', 'row', 'column']
+
+    def classify(self, query: str, query_embedding: List[float]) -> Tuple[str, Dict[str, float]]:
+        words = query.lower()
+        scores = {
+            ROUTE_MULTIMODAL: float(any(word in words for word in self.IMAGE_WORDS)),
+            ROUTE_TABLE: float(any(word in words for word in self.TABLE_WORDS))
+        }
+        if scores[ROUTE_MULTIMODAL]:
+            return ROUTE_MULTIMODAL, scores
+        if scores[ROUTE_TABLE]:
+            return ROUTE_TABLE, scores
+        return ROUTE_TEXT, scores
+
+class EmbeddingQueryRouter(QueryRouter):
+    """Nearest-prototype router over the query embedding.
+
+    Each route is represented by the centroid of a few example queries. The
+    examples are embedded once on first use, so routing a query costs a
+    handful of dot products on the embedding that retrieval computes anyway.
+    """
+
+    EXAMPLES = {
+        ROUTE_NONE: [
+            "Thanks!",
+            "Hello",
+            "Ok, got it",
+            "Thank you, that helps",
+            "Great, thanks for the explanation"
+        ],
+        ROUTE_TEXT: [
+            "Show me the conclusion",
+            "Summarize the introduction",
+            "What does the author say about the results?",
+            "Explain the methodology used in the study",
+            "What are the main recommendations?"
+        ],
+        ROUTE_MULTIMODAL: [
+            "Describe the figure on page 3",
+            "What does the diagram illustrate?",
+            "Explain the chart showing the trend",
+            "What is shown in the picture?",
+            "What do the images in the document depict?"
+        ],
+        ROUTE_TABLE: [
+            "What are the values in the table?",
+            "Which row of the table has the highest total?",
+            "Compare the numbers across the table columns",
+            "List the figures reported in the results table",
+            "What is the value for 2020 in the table?"
+        ]
+    }
+
+    def __init__(self, config: ProcessingConfig, embeddings: Any, examples: Dict[str, List[str]] = None):
+        super().__init__(config)
+        self.embeddings = embeddings
+        self.examples = examples or self.EXAMPLES
+        self._centroids = None
+
+    def _get_centroids(self) -> Tuple[List[str], np.ndarray]:
+        """Embed the example queries once and cache one unit centroid per route"""
+        if self._centroids is None:
+            routes = list(self.examples)
+            centroids = []
+            for route in routes:
+                # Embedded like incoming queries, since embed_documents uses a different task type
+                vectors = np.asarray(
+                    [self.embeddings.embed_query(example) for example in self.examples[route]], dtype=np.float32
+                )
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                centroid = vectors.mean(axis=0)
+                centroids.append(centroid / np.linalg.norm(centroid))
+            self._centroids = (routes, np.vstack(centroids))
+        return self._centroids
+
+    def classify(self, query: str, query_embedding: List[float]) -> Tuple[str, Dict[str, float]]:
+        try:
+            routes, centroids = self._get_centroids()
+        except Exception as e:
+            # Not cached, so the example embeddings are retried on the next query
+            logger.warning(f"Could not embed router examples, falling back to text retrieval: {e}")
+            return ROUTE_TEXT, {}
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        similarities = centroids @ (query_vector / np.linalg.norm(query_vector))
+        scores = {route: float(score) for route, score in zip(routes, similarities)}
+
+        best = int(np.argmax(similarities))
+        # Fall back to plain text retrieval when no route is a clear match
+        if similarities[best] < self.config.router_min_similarity:
+            return ROUTE_TEXT, scores
+        # Skipping retrieval answers without any document context, so only do it
+        # for short queries that clearly beat the text route
+        if routes[best] == ROUTE_NONE and (
+            len(query.split()) > self.config.router_none_max_words
+            or scores[ROUTE_NONE] - scores.get(ROUTE_TEXT, float('-inf')) < self.config.router_none_margin
+        ):
+            return ROUTE_TEXT, scores
+        return routes[best], scores
@@ -1,16 +1,20 @@
-from typing import List
+import os
+import uuid
+from typing import Dict, Iterable, List, Set, Tuple
 import chromadb
 from chromadb.config import Settings
 from .exceptions import RetrieverError
-from .utils import ProcessingConfig
+from .utils import ProcessingConfig, match_page_fingerprints
+from .vector_store import QuantizedVectorStore
 
 class Retriever:
     def __init__(self, config: ProcessingConfig):
         self.config = config
+        self.persist_directory = "chroma_db"
         self.client = chromadb.Client(Settings(
             allow_reset=True,
             is_persistent=True,
-            persist_directory="chroma_db"
+            persist_directory=self.persist_directory
         ))
         self._initialize_collection()
 
@@ -23,37 +27,66 @@ class Retriever:
             except:
                 pass
             # Create new collection
-            self.collection = self.client.create_collection("document_chunks")
+            if self.config.vector_quantization == "int8":
+                self.collection = QuantizedVectorStore(
+                    os.path.join(self.persist_directory, "document_chunks.f32"),
+                    rerank_candidates=self.config.rerank_candidates
+                )
+            elif self.config.vector_quantization is None:
+                self.collection = self.client.create_collection("document_chunks")
+            else:
+                raise RetrieverError(f"Unsupported vector quantization: {self.config.vector_quantization}")
+            # Fingerprints of the pages currently indexed, keyed by 1-based page number
+            self.page_fingerprints: Dict[int, str] = {}
         except Exception as e:
             raise RetrieverError(f"Error initializing collection: {e}")
 
-    def add_chunks(self, chunks: List[str], embeddings: List[List[float]], metadata: List[dict] = None):
-        """Add text chunks to ChromaDB"""
+    def plan_pages(self, fingerprints: Dict[int, str]) -> Tuple[Dict[int, int], Set[int], Set[int]]:
+        """Compare a new revision with the indexed pages; see match_page_fingerprints"""
+        return match_page_fingerprints(self.page_fingerprints, fingerprints)
+
+    def replace_pages(self, fingerprints: Dict[int, str], moves: Dict[int, int], removed: Iterable[int],
+                      chunks: List[str], embeddings: List[List[float]], metadata: List[dict]):
+        """Bring the index in line with a new revision, leaving unchanged pages untouched.
+
+        Chunks of removed pages are deleted, chunks of moved pages only get their
+        page metadata rewritten, and the given chunks are added for changed pages.
+        """
         try:
-            # Create default metadata if none provided
-            if metadata is None:
-                metadata = [{"chunk_id": str(i), "position": i} for i in range(len(chunks))]
+            # Removed pages are addressed by their old numbers, so drop them before moving others
+            removed = sorted(set(removed))
+            if removed:
+                self.collection.delete(where={"page": {"$in": removed}})
             
-            # Generate unique IDs for each chunk
-            ids = [f"chunk_{i}" for i in range(len(chunks))]
+            if moves:
+                moved = self.collection.get(where={"page": {"$in": sorted(moves)}}, include=["metadatas"])
+                if moved['ids']:
+                    self.collection.update(
+                        ids=moved['ids'],
+                        metadatas=[{**meta, "page": moves[meta['page']]} for meta in moved['metadatas']]
+                    )
             
-            self.collection.add(
-                documents=chunks,
-                embeddings=embeddings,
-                metadatas=metadata,
-                ids=ids
-            )
+            if chunks:
+                # Random IDs, since a moved page keeps its chunks while its old number is reused
+                self.collection.add(
+                    documents=chunks,
+                    embeddings=embeddings,
+                    metadatas=metadata,
+                    ids=[uuid.uuid4().hex for _ in chunks]
+                )
+            
+            self.page_fingerprints = dict(fingerprints)
         except Exception as e:
-            raise RetrieverError(f"Error adding chunks to ChromaDB: {e}")
+            raise RetrieverError(f"Error replacing pages in ChromaDB: {e}")
 
-    def retrieve_relevant(self, query: str, embeddings: List[float]) -> List[str]:
-        """Retrieve relevant chunks based on query"""
+    def retrieve_relevant(self, query: str, embeddings: List[float], k: int = None) -> Tuple[List[str], List[dict]]:
+        """Retrieve relevant chunks and their metadata based on query"""
         try:
             results = self.collection.query(
                 query_embeddings=[embeddings],
-                n_results=self.config.retrieval_k
+                n_results=k or self.config.retrieval_k
             )
-            return results['documents'][0]  # First list of documents
+            return results['documents'][0], results['metadatas'][0]  # Results for the first query
         except Exception as e:
             raise RetrieverError(f"Error retrieving chunks from ChromaDB: {e}")
 
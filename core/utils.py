@@ -1,6 +1,7 @@
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
 
 @dataclass
 class ProcessingConfig:
@@ -11,12 +12,52 @@ class ProcessingConfig:
     temperature: float = 0.4
     max_file_size: int = 50 * 1024 * 1024  # 50MB
     max_images: int = 10
+    max_tables: int = 5  # Tables added to the context for table-focused queries
+    incremental_ingest: bool = True  # Only re-embed pages whose fingerprint changed
+    vector_quantization: Optional[str] = None  # None for ChromaDB float vectors, "int8" for the compact store
+    rerank_candidates: int = 50  # Candidates re-ranked exactly when vectors are quantized
+    router_min_similarity: float = 0.5  # Below this the query router falls back to text retrieval
+    router_none_margin: float = 0.05  # Lead over the text route needed to skip retrieval
+    router_none_max_words: int = 6  # Longer queries always get retrieval
+    ocr_scanned_pages: bool = True  # OCR pages that have images but no extractable text
+    ocr_dpi: int = 200  # Render resolution for OCR; memory per worker grows with its square
+    ocr_language: str = "eng"
+    ocr_workers: Optional[int] = None  # Defaults to the CPU count
+    ocr_cache_dir: str = "ocr_cache"
     supported_mime_types: List[str] = None
 
     def __post_init__(self):
         if self.supported_mime_types is None:
             self.supported_mime_types = ["image/jpeg", "image/png"]
 
+def match_page_fingerprints(indexed: Dict[int, str], fingerprints: Dict[int, str]) -> Tuple[Dict[int, int], Set[int], Set[int]]:
+    """Match the pages of a new revision to indexed pages by fingerprint.
+
+    Returns the indexed pages that only moved (old page -> new page), the new
+    pages that need embedding and the indexed pages that have to be dropped.
+    """
+    available = defaultdict(list)
+    for page, fingerprint in sorted(indexed.items()):
+        available[fingerprint].append(page)
+    
+    # Pages that kept both content and position are claimed first, so they never move
+    unmatched = []
+    for page, fingerprint in sorted(fingerprints.items()):
+        if indexed.get(page) == fingerprint:
+            available[fingerprint].remove(page)
+        else:
+            unmatched.append(page)
+    
+    moves = {}
+    changed = set()
+    for page in unmatched:
+        if available.get(fingerprints[page]):
+            moves[available[fingerprints[page]].pop(0)] = page
+        else:
+            changed.add(page)
+    removed = {page for pages in available.values() for page in pages}
+    return moves, changed, removed
+
 def setup_logging():
     """Configure logging for the application"""
     logging.basicConfig(
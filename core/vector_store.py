@@ -0,0 +1,181 @@
+import os
+import sys
+import numpy as np
+from typing import List, Dict, Any, Optional
+import logging
+from .exceptions import RetrieverError
+
+logger = logging.getLogger(__name__)
+
+class QuantizedVectorStore:
+    """Compact vector store keeping int8 codes in memory and full vectors on disk.
+
+    Candidate search runs on per-vector int8 scalar-quantized codes. The best
+    candidates are then re-ranked exactly against the float32 vectors, which
+    live in a memory-mapped file instead of the process heap. The methods
+    mirror the subset of the ChromaDB collection API used by the Retriever.
+    """
+
+    def __init__(self, vectors_path: str, rerank_candidates: int = 50, block_size: int = 4096):
+        self.vectors_path = vectors_path
+        self.rerank_candidates = rerank_candidates
+        self.block_size = block_size
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[dict] = []
+        self.dim: Optional[int] = None
+        self.codes = np.empty((0, 0), dtype=np.int8)
+        self.scales = np.empty(0, dtype=np.float32)
+        self.sq_norms = np.empty(0, dtype=np.float32)
+        self.full_vectors = None
+
+        # Start from an empty vectors file, like a freshly created collection
+        os.makedirs(os.path.dirname(self.vectors_path) or ".", exist_ok=True)
+        open(self.vectors_path, 'wb').close()
+
+    def _quantize(self, vectors: np.ndarray):
+        """Symmetric per-vector int8 quantization"""
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def _remap(self):
+        """Re-open the memory map after the vectors file changed size"""
+        self.full_vectors = None
+        if self.ids:
+            self.full_vectors = np.memmap(
+                self.vectors_path, dtype=np.float32, mode='r', shape=(len(self.ids), self.dim)
+            )
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes held in memory versus on disk.
+
+        Unlike ChromaDB, which keeps documents and metadata in SQLite, this store
+        holds them on the heap, so they count towards 'in_memory'. Their size is
+        estimated with sys.getsizeof.
+        """
+        vector_bytes = self.codes.nbytes + self.scales.nbytes + self.sq_norms.nbytes
+        document_bytes = sum(sys.getsizeof(values) for values in (self.ids, self.documents, self.metadatas))
+        document_bytes += sum(sys.getsizeof(entry_id) for entry_id in self.ids)
+        document_bytes += sum(sys.getsizeof(document) for document in self.documents)
+        for meta in self.metadatas:
+            document_bytes += sys.getsizeof(meta) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in meta.items())
+        return {
+            'vectors': vector_bytes,
+            'documents': document_bytes,
+            'in_memory': vector_bytes + document_bytes,
+            'memory_mapped': len(self.ids) * (self.dim or 0) * 4
+        }
+
+    def add(self, documents: List[str], embeddings: List[List[float]], metadatas: List[dict], ids: List[str]):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.size == 0:
+            return
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise RetrieverError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {self.dim}")
+
+        codes, scales = self._quantize(vectors)
+        self.codes = np.vstack([self.codes.reshape(-1, self.dim), codes])
+        self.scales = np.concatenate([self.scales, scales])
+        self.sq_norms = np.concatenate([self.sq_norms, np.einsum('ij,ij->i', vectors, vectors)])
+
+        self.full_vectors = None
+        with open(self.vectors_path, 'ab') as f:
+            f.write(vectors.tobytes())
+
+        self.ids.extend(ids)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+        self._remap()
+
+    def _matches(self, metadata: dict, where: Dict[str, Any]) -> bool:
+        """Evaluate the equality and $in filters supported by this store"""
+        for key, condition in where.items():
+            value = metadata.get(key)
+            if isinstance(condition, dict):
+                if '$in' in condition and value not in condition['$in']:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def get(self, where: Dict[str, Any] = None, include: List[str] = None) -> Dict[str, list]:
+        indices = [i for i, meta in enumerate(self.metadatas) if where is None or self._matches(meta, where)]
+        return {
+            'ids': [self.ids[i] for i in indices],
+            'documents': [self.documents[i] for i in indices],
+            'metadatas': [self.metadatas[i] for i in indices]
+        }
+
+    def update(self, ids: List[str], metadatas: List[dict]):
+        positions = {entry_id: i for i, entry_id in enumerate(self.ids)}
+        for entry_id, meta in zip(ids, metadatas):
+            self.metadatas[positions[entry_id]] = meta
+
+    def delete(self, ids: List[str] = None, where: Dict[str, Any] = None):
+        id_set = set(ids or [])
+        keep = np.array([
+            not (entry_id in id_set or (where is not None and self._matches(meta, where)))
+            for entry_id, meta in zip(self.ids, self.metadatas)
+        ], dtype=bool)
+        if keep.all():
+            return
+
+        # Compact the vectors file block by block so only block_size rows are ever copied to the heap
+        tmp_path = f"{self.vectors_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for start in range(0, len(self.ids), self.block_size):
+                block_keep = keep[start:start + self.block_size]
+                f.write(np.ascontiguousarray(self.full_vectors[start:start + self.block_size][block_keep]).tobytes())
+        self.full_vectors = None
+        os.replace(tmp_path, self.vectors_path)
+
+        self.codes = self.codes[keep]
+        self.scales = self.scales[keep]
+        self.sq_norms = self.sq_norms[keep]
+        self.ids = [v for v, k in zip(self.ids, keep) if k]
+        self.documents = [v for v, k in zip(self.documents, keep) if k]
+        self.metadatas = [v for v, k in zip(self.metadatas, keep) if k]
+        self._remap()
+
+    def _approximate_distances(self, query: np.ndarray) -> np.ndarray:
+        """Squared L2 distances estimated from the int8 codes, computed block by block"""
+        dots = np.empty(len(self.ids), dtype=np.float32)
+        for start in range(0, len(self.ids), self.block_size):
+            block = self.codes[start:start + self.block_size].astype(np.float32)
+            dots[start:start + self.block_size] = block @ query
+        return self.sq_norms - 2.0 * self.scales * dots + float(query @ query)
+
+    def search(self, query: List[float], k: int, rerank_candidates: Optional[int] = None):
+        """Return (indices, distances) of the k nearest vectors"""
+        if not self.ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        k = min(k, len(self.ids))
+        n_candidates = self.rerank_candidates if rerank_candidates is None else rerank_candidates
+        n_candidates = min(max(n_candidates, k), len(self.ids))
+
+        approx = self._approximate_distances(query)
+        candidates = np.sort(np.argpartition(approx, n_candidates - 1)[:n_candidates])
+
+        # Exact re-rank of the candidates against the full-precision vectors
+        diffs = self.full_vectors[candidates] - query
+        exact = np.einsum('ij,ij->i', diffs, diffs)
+        order = np.argsort(exact)[:k]
+        return candidates[order], exact[order]
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10) -> Dict[str, List[list]]:
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        for embedding in query_embeddings:
+            indices, distances = self.search(embedding, n_results)
+            results['ids'].append([self.ids[i] for i in indices])
+            results['documents'].append([self.documents[i] for i in indices])
+            results['metadatas'].append([self.metadatas[i] for i in indices])
+            results['distances'].append(distances.tolist())
+        return results
@@ -7,9 +7,11 @@ from core import (
     ImageProcessor,
     ModelManager,
     Retriever,
+    EmbeddingQueryRouter,
     ProcessingConfig,
     setup_logging
 )
+from core.query_router import ROUTE_NONE
 
 # Configure logging
 setup_logging()
@@ -27,29 +29,74 @@ class MultimodalRAG:
         self.img_processor = ImageProcessor(self.config)
         self.model_manager = ModelManager(self.config)
         self.retriever = Retriever(self.config)
+        # Extracted images of the indexed document, keyed by 1-based page number
+        self.page_images = {}
+        # Any QueryRouter can be swapped in; the last decision is kept for tuning
+        self.router = EmbeddingQueryRouter(self.config, self.model_manager.embeddings)
+        self.last_route = None
 
     def process_document(self, pdf_path: str):
-        """Process uploaded PDF document"""
+        """Process uploaded PDF document, re-embedding only pages that changed"""
         try:
             logger.info(f"Processing document: {pdf_path}")
             
-            # Extract content from PDF
+            # Extract content and per-page fingerprints from PDF
             text_content = self.doc_processor.extract_pdf_content(pdf_path)
-            images = self.img_processor.extract_images(pdf_path)
+            fingerprints = text_content['fingerprints']
             
-            # Create text chunks 
-            all_text = []
+            # Match pages to what is already indexed, so pages that only moved
+            # (e.g. after a page was inserted earlier on) keep their vectors
+            if not self.config.incremental_ingest:
+                self.retriever.reset()
+                self.page_images = {}
+            moves, changed_pages, removed_pages = self.retriever.plan_pages(fingerprints)
+            
+            # Carry images over for unchanged and moved pages
+            old_numbers = {new: old for old, new in moves.items()}
+            page_images = {}
+            for page in fingerprints:
+                if page not in changed_pages:
+                    old_page = old_numbers.get(page, page)
+                    page_images[page] = [dict(image, page=page) for image in self.page_images.get(old_page, [])]
+            
+            # Re-extract images for changed pages only. OCR'd scans are skipped:
+            # their text is already indexed and full-page images would only
+            # grow memory with the page count.
+            if changed_pages:
+                for page in changed_pages:
+                    page_images[page] = []
+                image_pages = changed_pages - text_content['ocr_pages']
+                for image in self.img_processor.extract_images(pdf_path, pages=image_pages):
+                    page_images[image['page']].append(image)
+            self.page_images = page_images
+            images = [image for page in sorted(self.page_images) for image in self.page_images[page]]
+            
+            # Create text chunks per page so each page can be replaced independently.
+            # The page number lives in the metadata, not the embedded text, so a
+            # moved page's vectors stay valid.
+            chunks = []
+            metadata = []
             for text_item in text_content['text']:
-                all_text.append(f"[Page {text_item['page']}] {text_item['content']}")
-            text_combined = "\n".join(all_text)
-            chunks = self.doc_processor.create_chunks(text_combined)
+                page = text_item['page']
+                if page not in changed_pages:
+                    continue
+                page_chunks = self.doc_processor.create_chunks(text_item['content'])
+                for position, chunk in enumerate(page_chunks):
+                    chunks.append(chunk)
+                    metadata.append({
+                        "page": page,
+                        "position": position,
+                        "fingerprint": fingerprints[page]
+                    })
             
-            # Get embeddings and store in ChromaDB
-            embeddings = self.model_manager.embeddings.embed_documents(chunks)
-            self.retriever.reset()  # Reset for new document
-            self.retriever.add_chunks(chunks, embeddings)
+            # Get embeddings and swap the affected pages in ChromaDB
+            embeddings = self.model_manager.embeddings.embed_documents(chunks) if chunks else []
+            self.retriever.replace_pages(fingerprints, moves, removed_pages, chunks, embeddings, metadata)
             
-            logger.info(f"Document processed successfully: {len(chunks)} chunks created")
+            logger.info(
+                f"Document processed successfully: {len(changed_pages)} of {len(fingerprints)} pages changed, "
+                f"{len(moves)} moved, {len(removed_pages)} removed, {len(chunks)} chunks re-embedded"
+            )
             return {'text_content': text_content, 'images': images}
             
         except Exception as e:
@@ -61,19 +108,56 @@ class MultimodalRAG:
         try:
             logger.info(f"Generating response for query: {query}")
             
-            # Get query embedding and retrieve relevant chunks
+            # Get query embedding and decide which retrieval path it needs
             query_embedding = self.model_manager.embeddings.embed_query(query)
-            relevant_chunks = self.retriever.retrieve_relevant(query, query_embedding)
-            text_context = "\n".join(relevant_chunks)
+            decision = self.router.route(query, query_embedding)
+            self.last_route = decision
+            logger.info(
+                f"Routed query to '{decision.route}' in {decision.latency_ms:.2f} ms "
+                f"(k={decision.retrieval_k}, images={decision.max_images}, scores={decision.scores})"
+            )
             
-            # Check if query is image-related
-            image_related = any(word in query.lower() for word in 
-                              ['image', 'figure', 'picture', 'diagram', 'graph', 'show', 'visual'])
+            if decision.route == ROUTE_NONE:
+                logger.info("Processing conversational query without retrieval")
+                return self.model_manager.generate_text_response(
+                    f"Reply briefly to this follow-up about a document: {query}"
+                )
+            
+            relevant_chunks, chunk_metadata = self.retriever.retrieve_relevant(
+                query, query_embedding, k=decision.retrieval_k
+            )
+            text_context = "\n".join(
+                f"[Page {meta['page']}] {chunk}" if meta and 'page' in meta else chunk
+                for chunk, meta in zip(relevant_chunks, chunk_metadata)
+            )
+            # Pages of the retrieved chunks, most relevant first
+            relevant_pages = list(dict.fromkeys(
+                meta['page'] for meta in chunk_metadata if meta and 'page' in meta
+            ))
+            
+            if decision.include_tables and context['text_content']['tables']:
+                logger.info(f"Adding extracted tables from pages {relevant_pages} to the context")
+                page_rank = {page: rank for rank, page in enumerate(relevant_pages)}
+                page_tables = sorted(
+                    (table for table in context['text_content']['tables'] if table['page'] in page_rank),
+                    key=lambda table: page_rank[table['page']]
+                )
+                tables = []
+                for table in page_tables[:self.config.max_tables]:
+                    rows = "\n".join(" | ".join(str(cell) for cell in row) for row in table['content'])
+                    tables.append(f"[Page {table['page']} table]\n{rows}")
+                text_context = "\n\n".join([text_context] + tables)
             
-            if image_related and context['images']:
-                logger.info("Processing image-related query with multimodal model")
+            if decision.max_images and context['images']:
+                # Prefer images on the retrieved pages, falling back to the document's images
+                page_rank = {page: rank for rank, page in enumerate(relevant_pages)}
+                images = sorted(
+                    (image for image in context['images'] if image['page'] in page_rank),
+                    key=lambda image: page_rank[image['page']]
+                ) or context['images']
+                logger.info(f"Processing image-related query with multimodal model ({min(len(images), decision.max_images)} images)")
                 prompt_parts = self.img_processor.prepare_vision_prompt(
-                    query, text_context, context['images']
+                    query, text_context, images, max_images=decision.max_images
                 )
                 return self.model_manager.generate_multimodal_response(prompt_parts)
             else:
@@ -0,0 +1,58 @@
+import pytest
+
+from core.utils import ProcessingConfig, match_page_fingerprints
+
+
+def test_unchanged_pages_are_kept():
+    assert match_page_fingerprints({1: "a", 2: "b"}, {1: "a", 2: "b"}) == ({}, set(), set())
+
+
+def test_inserted_page_moves_later_pages():
+    moves, changed, removed = match_page_fingerprints({1: "a", 2: "b", 3: "c"}, {1: "a", 2: "x", 3: "b", 4: "c"})
+    assert moves == {2: 3, 3: 4}
+    assert changed == {2}
+    assert removed == set()
+
+
+def test_removed_pages_are_dropped():
+    moves, changed, removed = match_page_fingerprints({1: "a", 2: "b", 3: "c"}, {1: "a", 2: "c"})
+    assert moves == {3: 2}
+    assert changed == set()
+    assert removed == {2}
+
+
+def test_duplicate_fingerprints_are_matched_once():
+    moves, changed, removed = match_page_fingerprints({1: "blank"}, {1: "blank", 2: "blank"})
+    assert moves == {}
+    assert changed == {2}
+    assert removed == set()
+
+
+@pytest.mark.parametrize("quantization", [None, "int8"])
+def test_replace_pages_drops_removed_and_moves_pages(tmp_path, monkeypatch, quantization):
+    pytest.importorskip("chromadb")
+    pytest.importorskip("numpy")
+    from core.retriever import Retriever
+
+    monkeypatch.chdir(tmp_path)
+    retriever = Retriever(ProcessingConfig(vector_quantization=quantization))
+
+    def apply(fingerprints, chunks):
+        moves, changed, removed = retriever.plan_pages(fingerprints)
+        new_chunks = [(page, text) for page, text in chunks if page in changed]
+        retriever.replace_pages(
+            fingerprints, moves, removed,
+            [text for _, text in new_chunks],
+            [[float(page), 1.0] for page, _ in new_chunks],
+            [{"page": page, "position": 0, "fingerprint": fingerprints[page]} for page, _ in new_chunks]
+        )
+
+    def indexed():
+        stored = retriever.collection.get(include=["documents", "metadatas"])
+        return sorted((meta["page"], text) for meta, text in zip(stored["metadatas"], stored["documents"]))
+
+    apply({1: "a", 2: "b", 3: "c"}, [(1, "A"), (2, "B"), (3, "C")])
+    apply({1: "a", 2: "c"}, [(1, "A"), (2, "C")])
+
+    assert indexed() == [(1, "A"), (2, "C")]
+    assert retriever.page_fingerprints == {1: "a", 2: "c"}
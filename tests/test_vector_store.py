@@ -0,0 +1,65 @@
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.exceptions import RetrieverError
+from core.vector_store import QuantizedVectorStore
+
+
+def make_store(tmp_path, vectors, pages=None, **kwargs):
+    store = QuantizedVectorStore(str(tmp_path / "vectors.f32"), **kwargs)
+    pages = pages or [i + 1 for i in range(len(vectors))]
+    store.add(
+        documents=[f"chunk {i}" for i in range(len(vectors))],
+        embeddings=vectors,
+        metadatas=[{"page": page, "position": 0} for page in pages],
+        ids=[f"id{i}" for i in range(len(vectors))]
+    )
+    return store
+
+
+def test_recall_against_exact_search(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 32)).astype(np.float32)
+    queries = rng.normal(size=(50, 32)).astype(np.float32)
+    store = make_store(tmp_path, vectors, rerank_candidates=50)
+
+    hits = 0
+    for query in queries:
+        exact = np.argsort(((vectors - query) ** 2).sum(axis=1))[:5]
+        indices, distances = store.search(query, 5)
+        hits += len(set(exact) & set(indices.tolist()))
+        assert np.all(np.diff(distances) >= 0)
+    assert hits / (len(queries) * 5) >= 0.99
+
+
+def test_delete_compacts_vectors_file(tmp_path):
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(10, 4)).astype(np.float32)
+    store = make_store(tmp_path, vectors, pages=[i % 3 for i in range(10)], block_size=3)
+
+    store.delete(where={"page": {"$in": [1]}})
+
+    kept = [i for i in range(10) if i % 3 != 1]
+    assert store.count() == len(kept)
+    assert os.path.getsize(store.vectors_path) == len(kept) * 4 * 4
+    np.testing.assert_array_equal(np.asarray(store.full_vectors), vectors[kept])
+    assert store.ids == [f"id{i}" for i in kept]
+
+
+def test_deleted_pages_are_not_returned(tmp_path):
+    vectors = np.eye(4, dtype=np.float32)
+    store = make_store(tmp_path, vectors, pages=[1, 2, 3, 4])
+
+    store.delete(where={"page": {"$in": [2, 3]}})
+
+    results = store.query(query_embeddings=[vectors[1]], n_results=4)
+    assert sorted(meta["page"] for meta in results["metadatas"][0]) == [1, 4]
+
+
+def test_dimension_mismatch_raises(tmp_path):
+    store = make_store(tmp_path, np.ones((2, 4), dtype=np.float32))
+
+    with pytest.raises(RetrieverError):
+        store.add(documents=["x"], embeddings=[[1.0, 2.0]], metadatas=[{}], ids=["x"])